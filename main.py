@@ -1,14 +1,29 @@
+import hashlib
+import inspect
 import logging
-import threading
-import traceback
-
-from fastapi import Depends, FastAPI, HTTPException, Query, status
+import os
+import secrets
+from collections.abc import Callable, Iterable
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from itertools import count, islice
+from operator import itemgetter
+from typing import Annotated, Any, TypeVar
+
+import anyio
+import anyio.to_thread
+import orjson
+from fastapi import Body, Depends, FastAPI, HTTPException, Path, Query, Request, Response, status
 from fastapi.exceptions import RequestValidationError
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import APIRoute
+from sortedcontainers import SortedList
 
 from models import (
+    MAX_INT64,
     Item,
     ItemCreate,
+    ItemRow,
     ItemUpdate,
     ItemResponse,
     ErrorResponse,
@@ -34,44 +49,197 @@ class DatabaseError(Exception):
     pass
 
 
+# ================================================================
+# Blocking Work
+# ================================================================
+
+# Concurrent worker threads allowed for blocking work offloaded with run_blocking
+BLOCKING_IO_TOKENS = 32
+
+# Created in lifespan, since anyio limiters belong to the running event loop
+_blocking_limiter: anyio.CapacityLimiter | None = None
+
+T = TypeVar("T")
+
+
+async def run_blocking(func: Callable[..., T], *args: Any) -> T:
+    """Run blocking code (file I/O, sync clients) in a worker thread.
+
+    Calls are capped by their own limiter, so slow blocking work cannot use up the
+    threadpool tokens that sync endpoints and dependencies draw from.
+    """
+    return await anyio.to_thread.run_sync(func, *args, limiter=_blocking_limiter)
+
+
 # ================================================================
 # Application Setup
 # ================================================================
 
+# Threadpool size for sync endpoints and dependencies (anyio defaults to 40)
+THREADPOOL_TOKENS = 200
+
+# Upper bound on the number of items accepted by one bulk create request
+MAX_BULK_ITEMS = 1000
+
+
+def _is_async_callable(call: Callable[..., Any]) -> bool:
+    """Whether FastAPI awaits a callable directly instead of offloading it to the threadpool."""
+    if inspect.isclass(call):
+        return False
+    # Callable instances (e.g. OAuth2PasswordBearer) are async through their __call__
+    func = call if inspect.isroutine(call) else getattr(call, "__call__", None)
+    return inspect.iscoroutinefunction(func) or inspect.isasyncgenfunction(func)
+
+
+def _sync_callables(route: APIRoute) -> list[str]:
+    """Names of the endpoint and dependencies of a route that are not coroutines."""
+    found = []
+    pending = [route.dependant]
+    while pending:
+        dependant = pending.pop()
+        call = dependant.call
+        if call is not None and not _is_async_callable(call):
+            found.append(getattr(call, "__name__", type(call).__name__))
+        pending.extend(dependant.dependencies)
+    return found
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Set up threadpool limits and warn about handlers that would be offloaded to it."""
+    global _blocking_limiter
+    limiter = anyio.to_thread.current_default_thread_limiter()
+    limiter.total_tokens = THREADPOOL_TOKENS
+    _blocking_limiter = anyio.CapacityLimiter(BLOCKING_IO_TOKENS)
+
+    # Every handler here only touches in-memory state, so none should be sync
+    for route in app.routes:
+        if isinstance(route, APIRoute):
+            for name in _sync_callables(route):
+                logger.warning(f"{route.path}: {name} is not async and will run in the threadpool")
+    yield
+
+
 app = FastAPI(
     title="Item Management API",
     description="A simple FastAPI application for managing items with CRUD operations",
     version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
+# Path parameter for item IDs; the bounds keep echoed IDs within what orjson can encode,
+# while unknown IDs inside the 64-bit range (including negative ones) still get a 404
+ItemId = Annotated[int, Path(ge=-MAX_INT64 - 1, le=MAX_INT64, description="The ID of the item")]
+
 # Thread-safe in-memory storage (replace with a database in production)
-items_db: dict[int, Item] = {}
-_id_lock = threading.Lock()
-_next_id = 1
+items_db: dict[int, ItemRow] = {}
+# Secondary indexes over items_db, kept in sync on every write
+_ids = SortedList()  # all item ids, for cursor pagination
+_by_price = SortedList(key=itemgetter(0))  # (price, id) pairs ordered by price
+_in_stock_ids: set[int] = set()
+_trigrams: dict[str, set[int]] = {}  # trigram of a lowercased name -> ids containing it
+# count.__next__ runs in C under the GIL, so IDs stay unique without a lock
+_id_gen = count(1).__next__
 
 
 def get_next_id() -> int:
     """Thread-safe ID generation."""
-    global _next_id
-    with _id_lock:
-        current_id = _next_id
-        _next_id += 1
-    return current_id
+    return _id_gen()
+
+
+def _trigrams_of(text: str) -> set[str]:
+    """All 3-character substrings of a string."""
+    return {text[i : i + 3] for i in range(len(text) - 2)}
+
+
+def _index_item(row: ItemRow) -> None:
+    """Add an item to the secondary indexes."""
+    _ids.add(row.id)
+    _by_price.add((row.price, row.id))
+    if row.quantity > 0:
+        _in_stock_ids.add(row.id)
+
+    for trigram in _trigrams_of(row.name_lower):
+        _trigrams.setdefault(trigram, set()).add(row.id)
+
+
+def _unindex_item(row: ItemRow) -> None:
+    """Remove an item from the secondary indexes."""
+    _ids.remove(row.id)
+    _by_price.remove((row.price, row.id))
+    _in_stock_ids.discard(row.id)
+
+    for trigram in _trigrams_of(row.name_lower):
+        postings = _trigrams[trigram]
+        postings.discard(row.id)
+        if not postings:
+            del _trigrams[trigram]
+
+
+def _ids_matching_name(name: str) -> set[int]:
+    """Ids whose name contains the given string, ignoring case."""
+    query = name.lower()
+    trigrams = _trigrams_of(query)
+    if not trigrams:
+        # Queries shorter than a trigram fall back to scanning the precomputed names
+        return {item_id for item_id, row in items_db.items() if query in row.name_lower}
+
+    # Every trigram of the query must appear in a matching name
+    postings = sorted((_trigrams.get(t, set()) for t in trigrams), key=len)
+    if not postings[0]:
+        return set()
+    candidates = set.intersection(*postings)
+    return {item_id for item_id in candidates if query in items_db[item_id].name_lower}
+
+
+def _has_filters(filters: ItemFilters) -> bool:
+    """Whether any filter would narrow the item list."""
+    return bool(filters.name) or any(
+        value is not None for value in (filters.min_price, filters.max_price, filters.in_stock)
+    )
+
+
+def _candidate_ids(filters: ItemFilters, after_id: int | None = None) -> Iterable[int]:
+    """Ids matching all filters and above the cursor, in ascending order, resolved from the indexes."""
+    # Seek straight to the cursor instead of skipping over earlier ids
+    all_ids = _ids.irange(minimum=after_id, inclusive=(False, True))
+
+    ids: set[int] | None = None  # None until some filter narrows the result
+    if filters.name:
+        ids = _ids_matching_name(filters.name)
+    if filters.min_price is not None or filters.max_price is not None:
+        in_range = {item_id for _, item_id in _by_price.irange_key(filters.min_price, filters.max_price)}
+        ids = in_range if ids is None else ids & in_range
+    if filters.in_stock is True:
+        ids = set(_in_stock_ids) if ids is None else ids & _in_stock_ids
+    elif filters.in_stock is False:
+        if ids is None:
+            # Out-of-stock items have no index of their own; walk the store lazily
+            return (item_id for item_id in all_ids if item_id not in _in_stock_ids)
+        ids -= _in_stock_ids
+
+    if ids is None:
+        return all_ids
+    if after_id is not None:
+        return sorted(item_id for item_id in ids if item_id > after_id)
+    return sorted(ids)
 
 
 # ================================================================
 # Dependency Functions
 # ================================================================
 
-def get_pagination(
-    skip: int = Query(default=0, ge=0, description="Number of items to skip"),
+async def get_pagination(
+    skip: int = Query(default=0, ge=0, le=MAX_INT64, description="Number of items to skip"),
     limit: int = Query(default=10, ge=1, le=100, description="Number of items to return"),
+    after_id: int | None = Query(default=None, ge=0, le=MAX_INT64, description="Only return items with an ID greater than this cursor"),
 ) -> PaginationParams:
     """Parse pagination query parameters."""
-    return PaginationParams(skip=skip, limit=limit)
+    return PaginationParams(skip=skip, limit=limit, after_id=after_id)
 
 
-def get_item_filters(
+async def get_item_filters(
     name: str | None = Query(default=None, description="Filter by name (case-insensitive)"),
     min_price: float | None = Query(default=None, ge=0, description="Minimum price"),
     max_price: float | None = Query(default=None, ge=0, description="Maximum price"),
@@ -87,48 +255,113 @@ def get_item_filters(
         )
 
 
+# ================================================================
+# Conditional Responses
+# ================================================================
+
+def _etag_for(body: bytes) -> str:
+    """Strong ETag for a serialized response body."""
+    return f'"{hashlib.md5(body).hexdigest()}"'
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    """Whether the request's If-None-Match header covers the given ETag."""
+    header = request.headers.get("if-none-match")
+    if header is None:
+        return False
+    # If-None-Match uses weak comparison, so W/ prefixes are ignored
+    tags = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return "*" in tags or etag.removeprefix("W/") in tags
+
+
+def _json_or_not_modified(request: Request, body: bytes, etag: str) -> Response:
+    """Serve a pre-serialized JSON body, or an empty 304 if the client already has it."""
+    if _etag_matches(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    return Response(body, media_type="application/json", headers={"ETag": etag})
+
+
+# Item ETags carry a per-process token so tags never survive a restart or match across workers
+_ETAG_TOKEN = secrets.token_hex(4)
+_ITEM_CACHE_CONTROL = "private, max-age=0, must-revalidate"
+
+
+def _item_etag(row: ItemRow) -> str:
+    """Weak ETag for the current version of an item."""
+    return f'W/"{_ETAG_TOKEN}-{row.id}-{row.version}"'
+
+
+# The root response never changes, so it is serialized once at import time
+_ROOT_BODY = orjson.dumps({
+    "message": "Welcome to the Item Management API",
+    "version": "1.0.0",
+    "endpoints": {
+        "GET /items": "Get all items",
+        "POST /items": "Create a new item",
+        "POST /items/bulk": "Create several items at once",
+        "DELETE /items/{item_id}": "Delete an item by ID",
+    }
+})
+_ROOT_ETAG = _etag_for(_ROOT_BODY)
+
+
+@lru_cache(maxsize=1)
+def _health_payload(items_count: int) -> tuple[bytes, str]:
+    """Serialized health body and its ETag; only rebuilt when the item count changes."""
+    body = orjson.dumps({
+        "status": "healthy",
+        "items_count": items_count,
+    })
+    return body, _etag_for(body)
+
+
 @app.get("/", tags=["Root"])
-async def root():
+async def root(request: Request):
     """
     Root endpoint - Returns a simple welcome message
     """
-    return {
-        "message": "Welcome to the Item Management API",
-        "version": "1.0.0",
-        "endpoints": {
-            "GET /items": "Get all items",
-            "POST /items": "Create a new item",
-            "DELETE /items/{item_id}": "Delete an item by ID",
-        }
-    }
+    return _json_or_not_modified(request, _ROOT_BODY, _ROOT_ETAG)
 
 @app.get(
     "/items",
-    response_model=list[Item],
+    # Stored rows were validated on write, so the page is serialized as-is;
+    # the list[Item] schema is still documented through `responses`
+    response_model=None,
     status_code=status.HTTP_200_OK,
     tags=["Items"],
     summary="Get all items",
-    description="Retrieve items with optional filtering and pagination",
+    description=(
+        "Retrieve items with optional filtering and pagination. When a full page is returned, "
+        "the X-Next-Cursor header holds the after_id to pass for the next page."
+    ),
+    responses={
+        200: {
+            "model": list[Item],
+            "description": "Successful Response",
+        }
+    },
 )
 async def get_items(
     pagination: PaginationParams = Depends(get_pagination),
     filters: ItemFilters = Depends(get_item_filters),
 ):
-    # Start with all items
-    items = list(items_db.values())
-
-    # Apply filters
-    if filters.name:
-        items = [i for i in items if filters.name.lower() in i.name.lower()]
-    if filters.min_price is not None:
-        items = [i for i in items if i.price >= filters.min_price]
-    if filters.max_price is not None:
-        items = [i for i in items if i.price <= filters.max_price]
-    if filters.in_stock is not None:
-        items = [i for i in items if (i.quantity > 0) == filters.in_stock]
-
-    # Apply pagination
-    return items[pagination.skip : pagination.skip + pagination.limit]
+    if _has_filters(filters):
+        # Resolve all filters from the indexes, then fetch only the requested page
+        candidate_ids = _candidate_ids(filters, pagination.after_id)
+        # Skip and take separately, since skip + limit may exceed what islice accepts
+        page_ids = islice(islice(candidate_ids, pagination.skip, None), pagination.limit)
+    else:
+        # Slice the id index by position, so deep pages cost O(log N + limit)
+        start = pagination.skip
+        if pagination.after_id is not None:
+            start += _ids.bisect_right(pagination.after_id)
+        page_ids = _ids[start : start + pagination.limit]
+    page = [items_db[item_id] for item_id in page_ids]
+
+    headers = {}
+    if len(page) == pagination.limit:
+        headers["X-Next-Cursor"] = str(page[-1].id)
+    return ORJSONResponse([row.to_dict() for row in page], headers=headers)
 
 @app.get(
     "/items/{item_id}",
@@ -138,10 +371,20 @@ async def get_items(
     summary="Get an item by ID",
     description="Retrieve an item from the database by its ID",
 )
-async def get_item(item_id: int):
-    if item_id not in items_db:
+async def get_item(item_id: ItemId, request: Request, response: Response):
+    row = items_db.get(item_id)
+    if row is None:
         raise ItemNotFoundError(item_id)
-    return items_db[item_id]
+
+    etag = _item_etag(row)
+    if _etag_matches(request, etag):
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED,
+            headers={"ETag": etag, "Cache-Control": _ITEM_CACHE_CONTROL},
+        )
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = _ITEM_CACHE_CONTROL
+    return row.to_item()
 
 @app.post(
     "/items",
@@ -152,10 +395,28 @@ async def get_item(item_id: int):
     description="Create a new item in the database",
 )
 async def create_item(item: ItemCreate):
-    item_id = get_next_id()
-    new_item = Item(id=item_id, **item.model_dump())
-    items_db[item_id] = new_item
-    return new_item
+    row = ItemRow.from_create(get_next_id(), item)
+    items_db[row.id] = row
+    _index_item(row)
+    return row.to_item()
+
+@app.post(
+    "/items/bulk",
+    response_model=list[Item],
+    status_code=status.HTTP_201_CREATED,
+    tags=["Items"],
+    summary="Create several items",
+    description=f"Create up to {MAX_BULK_ITEMS} items in the database with a single request",
+)
+async def create_items_bulk(
+    items: list[ItemCreate] = Body(..., min_length=1, max_length=MAX_BULK_ITEMS),
+):
+    # The whole list is validated in one pass by pydantic-core before we get here
+    rows = [ItemRow.from_create(get_next_id(), item) for item in items]
+    for row in rows:
+        items_db[row.id] = row
+        _index_item(row)
+    return [row.to_item() for row in rows]
 
 @app.put(
     "/items/{item_id}",
@@ -165,11 +426,15 @@ async def create_item(item: ItemCreate):
     summary="Replace an item by ID",
     description="Replace an item in the database by its ID",
 )
-async def replace_item(item_id: int, item: ItemCreate):
-    if item_id not in items_db:
+async def replace_item(item_id: ItemId, item: ItemCreate):
+    old_row = items_db.get(item_id)
+    if old_row is None:
         raise ItemNotFoundError(item_id)
-    items_db[item_id] = Item(id=item_id, **item.model_dump())
-    return items_db[item_id]
+    _unindex_item(old_row)
+    row = items_db[item_id] = ItemRow.from_create(item_id, item)
+    row.version = old_row.version + 1
+    _index_item(row)
+    return row.to_item()
 
 @app.patch(
     "/items/{item_id}",
@@ -179,12 +444,22 @@ async def replace_item(item_id: int, item: ItemCreate):
     summary="Partially update an item by ID",
     description="Update specific fields of an item in the database by its ID",
 )
-async def update_item(item_id: int, item: ItemUpdate):
-    if item_id not in items_db:
+async def update_item(item_id: ItemId, item: ItemUpdate):
+    row = items_db.get(item_id)
+    if row is None:
         raise ItemNotFoundError(item_id)
-    updated_item = items_db[item_id].model_copy(update=item.model_dump(exclude_unset=True))
-    items_db[item_id] = updated_item
-    return updated_item
+    # Work out the new values first, so nothing can fail while the row is unindexed
+    changes = {field: getattr(item, field) for field in item.model_fields_set}
+    name_lower = changes["name"].lower() if "name" in changes else row.name_lower
+
+    _unindex_item(row)
+    # Both sides are already validated, so write the patched fields in place
+    for field, value in changes.items():
+        setattr(row, field, value)
+    row.name_lower = name_lower
+    row.version += 1
+    _index_item(row)
+    return row.to_item()
 
 @app.delete(
     "/items/{item_id}",
@@ -200,22 +475,21 @@ async def update_item(item_id: int, item: ItemUpdate):
         }
     }
 )
-async def delete_item(item_id: int):
-    if item_id not in items_db:
+async def delete_item(item_id: ItemId):
+    deleted_row = items_db.pop(item_id, None)
+    if deleted_row is None:
         raise ItemNotFoundError(item_id)
-    
-    deleted_item = items_db.pop(item_id)
+    _unindex_item(deleted_row)
+
     return ItemResponse(
         message=f"Item with ID {item_id} has been deleted successfully",
-        item=deleted_item
+        item=deleted_row.to_item()
     )
 
 @app.get("/health", tags=["Health"])
-async def health_check():
-    return {
-        "status": "healthy",
-        "items_count": len(items_db),
-    }
+async def health_check(request: Request):
+    body, etag = _health_payload(len(items_db))
+    return _json_or_not_modified(request, body, etag)
 
 # ================================================================
 # Exception Handlers
@@ -223,7 +497,7 @@ async def health_check():
 
 @app.exception_handler(ItemNotFoundError)
 async def item_not_found_handler(request, exc: ItemNotFoundError):
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=status.HTTP_404_NOT_FOUND,
         content={
             "detail": str(exc),
@@ -234,7 +508,7 @@ async def item_not_found_handler(request, exc: ItemNotFoundError):
 
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request, exc: HTTPException):
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=exc.status_code,
         content={
             "detail": exc.detail,
@@ -245,40 +519,60 @@ async def http_exception_handler(request, exc: HTTPException):
 
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request, exc: RequestValidationError):
-    errors = exc.errors()
-
-    formatted_errors = []
-    for error in errors:
-        formatted_errors.append({
-            "field": " -> ".join(str(loc) for loc in error["loc"]),
+    formatted_errors = [
+        {
+            "field": " -> ".join(map(str, error["loc"])),
             "message": error["msg"],
             "type": error["type"],
             "input": error.get("input"),
-        })
-
-    return JSONResponse(
-        status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
-        content={
-            "detail": "Validation error occurred",
-            "error_type": "validation_error",
-            "errors": formatted_errors,
         }
-    )
+        for error in exc.errors()
+    ]
+
+    content = {
+        "detail": "Validation error occurred",
+        "error_type": "validation_error",
+        "errors": formatted_errors,
+    }
+    try:
+        return ORJSONResponse(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, content=content)
+    except orjson.JSONEncodeError:
+        # The echoed input can hold integers wider than 64 bits, which only stdlib json encodes
+        return JSONResponse(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, content=content)
+
+# The 500 body never varies, so it is serialized once
+_INTERNAL_ERROR_BODY = orjson.dumps({
+    "detail": "An internal server error occurred",
+    "error_type": "internal_server_error",
+    "message": "Please contact support if the problem persists",
+})
 
 @app.exception_handler(Exception)
 async def generic_exception_handler(request, exc: Exception):
-    error_traceback = traceback.format_exc()
-    logger.error(f"Internal Server Error: {error_traceback}")
+    # The traceback is only formatted if a handler actually emits the record
+    logger.error("Internal Server Error", exc_info=exc)
 
-    return JSONResponse(
+    return Response(
+        _INTERNAL_ERROR_BODY,
         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-        content={
-            "detail": "An internal server error occurred",
-            "error_type": "internal_server_error",
-            "message": "Please contact support if the problem persists",
-        }
+        media_type="application/json",
     )
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+
+    # items_db lives in process memory, so every extra worker holds its own copy of it
+    workers = int(os.environ.get("UVICORN_WORKERS", "1"))
+    if workers > 1:
+        logger.warning(f"Running {workers} workers: each has a separate in-memory item store")
+
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=8000,
+        workers=workers,
+        loop="auto",  # uvloop wherever it is installed (not available on Windows)
+        http="httptools",
+        limit_concurrency=1024,
+        backlog=2048,
+    )
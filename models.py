@@ -1,10 +1,15 @@
+from dataclasses import dataclass
+
 from pydantic import BaseModel, Field, model_validator
 
+# Largest integer orjson can encode and islice accepts; bounds client-supplied integers
+MAX_INT64 = 2**63 - 1
+
 class ItemBase(BaseModel):
     name: str = Field(..., min_length=3, max_length=100, description="Name of the item")
     description: str | None = Field(None, max_length=300, description="Description of the item")
     price: float = Field(..., gt=0, description="Price of the item | Must be greater than 0")
-    quantity: int = Field(default=1, ge=0, description="Quantity of the item | Must be greater than or equal to 0")
+    quantity: int = Field(default=1, ge=0, le=MAX_INT64, description="Quantity of the item | Must be greater than or equal to 0")
 
 class ItemCreate(ItemBase):
     pass
@@ -15,7 +20,15 @@ class ItemUpdate(BaseModel):
     name: str | None = Field(None, min_length=3, max_length=100, description="Name of the item")
     description: str | None = Field(None, max_length=300, description="Description of the item")
     price: float | None = Field(None, gt=0, description="Price of the item | Must be greater than 0")
-    quantity: int | None = Field(None, ge=0, description="Quantity of the item | Must be greater than or equal to 0")
+    quantity: int | None = Field(None, ge=0, le=MAX_INT64, description="Quantity of the item | Must be greater than or equal to 0")
+
+    @model_validator(mode="after")
+    def reject_null_required_fields(self):
+        # Fields may be omitted, but only description can be explicitly cleared
+        for field in ("name", "price", "quantity"):
+            if field in self.model_fields_set and getattr(self, field) is None:
+                raise ValueError(f"{field} cannot be null")
+        return self
 
 
 class Item(ItemBase):
@@ -25,6 +38,44 @@ class Item(ItemBase):
         # Enables ORM mode for compatibility with SQLAlchemy
         from_attributes = True
 
+
+@dataclass(slots=True)
+class ItemRow:
+    """In-memory storage record for an item; far smaller than an Item model instance."""
+    id: int
+    name: str
+    name_lower: str
+    description: str | None
+    price: float
+    quantity: int
+    version: int = 1  # bumped on every replace/update, used for ETags
+
+    @classmethod
+    def from_create(cls, item_id: int, item: ItemCreate) -> "ItemRow":
+        """Build a row from already-validated input."""
+        return cls(item_id, item.name, item.name.lower(), item.description, item.price, item.quantity)
+
+    def to_dict(self) -> dict:
+        """Plain dict in the same shape as a serialized Item."""
+        return {
+            "name": self.name,
+            "description": self.description,
+            "price": self.price,
+            "quantity": self.quantity,
+            "id": self.id,
+        }
+
+    def to_item(self) -> Item:
+        """Convert to the API model without re-validating."""
+        return Item.model_construct(
+            id=self.id,
+            name=self.name,
+            description=self.description,
+            price=self.price,
+            quantity=self.quantity,
+        )
+
+
 class ItemResponse(BaseModel):
     message: str = Field(..., description="Message about the item")
     item: Item | None = None
@@ -42,8 +93,9 @@ class ValidationErrorResponse(BaseModel):
     errors: list[ValidationErrorDetail]
 
 class PaginationParams(BaseModel):
-    skip: int = Field(default=0, ge=0, description="Number of items to skip")
+    skip: int = Field(default=0, ge=0, le=MAX_INT64, description="Number of items to skip")
     limit: int = Field(default=10, ge=1, le=100, description="Number of items to return")
+    after_id: int | None = Field(None, ge=0, le=MAX_INT64, description="Only return items with an ID greater than this cursor")
 
 class ItemFilters(BaseModel):
     name: str | None = Field(None, description="Filter items by name (case-insensitive contains)")
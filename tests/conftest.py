@@ -0,0 +1,21 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+
+
+@pytest.fixture(autouse=True)
+def reset_store():
+    """Start every test with an empty store and empty indexes."""
+    main.items_db.clear()
+    main._ids.clear()
+    main._by_price.clear()
+    main._in_stock_ids.clear()
+    main._trigrams.clear()
+    yield
+
+
+@pytest.fixture
+def client():
+    with TestClient(main.app) as test_client:
+        yield test_client
@@ -0,0 +1,190 @@
+import main
+
+
+def assert_indexes_consistent():
+    """Rebuild every secondary index from items_db and compare with the live ones."""
+    rows = main.items_db.values()
+    assert list(main._ids) == sorted(main.items_db)
+    prices = [price for price, _ in main._by_price]
+    assert prices == sorted(prices)
+    assert sorted(main._by_price) == sorted((r.price, r.id) for r in rows)
+    assert main._in_stock_ids == {r.id for r in rows if r.quantity > 0}
+
+    expected_trigrams: dict[str, set[int]] = {}
+    for row in rows:
+        assert row.name_lower == row.name.lower()
+        for trigram in main._trigrams_of(row.name_lower):
+            expected_trigrams.setdefault(trigram, set()).add(row.id)
+    assert main._trigrams == expected_trigrams
+
+
+def create(client, name, price, quantity=1):
+    response = client.post("/items", json={"name": name, "price": price, "quantity": quantity})
+    assert response.status_code == 201, response.text
+    return response.json()["id"]
+
+
+def ids_of(response):
+    assert response.status_code == 200, response.text
+    return [item["id"] for item in response.json()]
+
+
+def test_create_indexes_item(client):
+    apple = create(client, "Apple", 1.5, quantity=3)
+    banana = create(client, "Banana", 2.0, quantity=0)
+    assert_indexes_consistent()
+
+    assert ids_of(client.get("/items", params={"name": "APP"})) == [apple]
+    assert ids_of(client.get("/items", params={"min_price": 2})) == [banana]
+    assert ids_of(client.get("/items", params={"in_stock": True})) == [apple]
+    assert ids_of(client.get("/items", params={"in_stock": False})) == [banana]
+
+
+def test_bulk_create_indexes_items(client):
+    response = client.post(
+        "/items/bulk",
+        json=[{"name": "bulk one", "price": 3}, {"name": "bulk two", "price": 4, "quantity": 0}],
+    )
+    assert response.status_code == 201
+    assert_indexes_consistent()
+    assert ids_of(client.get("/items", params={"name": "bulk"})) == [i["id"] for i in response.json()]
+
+
+def test_replace_reindexes_item(client):
+    item_id = create(client, "Cherry", 10, quantity=5)
+    response = client.put(f"/items/{item_id}", json={"name": "Damson", "price": 0.5, "quantity": 0})
+    assert response.status_code == 200
+    assert_indexes_consistent()
+
+    assert ids_of(client.get("/items", params={"name": "cherry"})) == []
+    assert ids_of(client.get("/items", params={"name": "damson"})) == [item_id]
+    assert ids_of(client.get("/items", params={"max_price": 1, "in_stock": False})) == [item_id]
+
+
+def test_patch_reindexes_item(client):
+    item_id = create(client, "Banana", 2.0, quantity=0)
+    response = client.patch(f"/items/{item_id}", json={"name": "Blueberry", "quantity": 4})
+    assert response.status_code == 200
+    assert response.json()["price"] == 2.0
+    assert_indexes_consistent()
+
+    assert ids_of(client.get("/items", params={"name": "berry"})) == [item_id]
+    assert ids_of(client.get("/items", params={"name": "banana"})) == []
+    assert ids_of(client.get("/items", params={"in_stock": True})) == [item_id]
+
+
+def test_delete_unindexes_item(client):
+    kept = create(client, "Grape", 25)
+    deleted = create(client, "Grapefruit", 30)
+    assert client.delete(f"/items/{deleted}").status_code == 200
+    assert client.delete(f"/items/{deleted}").status_code == 404
+    assert_indexes_consistent()
+
+    assert ids_of(client.get("/items", params={"name": "grape"})) == [kept]
+    assert ids_of(client.get("/items", params={"min_price": 20})) == [kept]
+
+
+def test_filters_match_naive_scan(client):
+    names = ["apple pie", "Banana split", "cherry tart", "grape jelly", "applesauce", "pear"]
+    ids = [create(client, name, price=n * 5 + 1, quantity=n % 3) for n, name in enumerate(names)]
+    client.patch(f"/items/{ids[1]}", json={"price": 40})
+    client.delete(f"/items/{ids[3]}")
+    assert_indexes_consistent()
+
+    stored = client.get("/items", params={"limit": 100}).json()
+    for params in [
+        {"name": "ap"},
+        {"name": "APPLE"},
+        {"min_price": 6, "max_price": 30},
+        {"in_stock": False, "name": "a"},
+        {"in_stock": True, "min_price": 10},
+    ]:
+        expected = [
+            item["id"]
+            for item in stored
+            if ("name" not in params or params["name"].lower() in item["name"].lower())
+            and ("min_price" not in params or item["price"] >= params["min_price"])
+            and ("max_price" not in params or item["price"] <= params["max_price"])
+            and ("in_stock" not in params or (item["quantity"] > 0) == params["in_stock"])
+        ]
+        assert ids_of(client.get("/items", params={**params, "limit": 100})) == expected, params
+
+
+def test_cursor_pagination_walks_all_items(client):
+    ids = [create(client, f"item {n}", price=n + 1) for n in range(12)]
+    client.delete(f"/items/{ids[4]}")
+    remaining = [i for i in ids if i != ids[4]]
+
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 5} if cursor is None else {"limit": 5, "after_id": cursor}
+        response = client.get("/items", params=params)
+        seen += ids_of(response)
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+    assert seen == remaining
+
+
+def test_cursor_pagination_with_filters_and_skip(client):
+    ids = [create(client, f"item {n}", price=n + 1, quantity=n % 2) for n in range(10)]
+    in_stock = [i for i, n in zip(ids, range(10)) if n % 2]
+
+    response = client.get("/items", params={"in_stock": True, "after_id": in_stock[0], "skip": 1, "limit": 2})
+    assert ids_of(response) == in_stock[2:4]
+    assert response.headers["X-Next-Cursor"] == str(in_stock[3])
+
+    response = client.get("/items", params={"after_id": ids[5], "skip": 1, "limit": 10})
+    assert ids_of(response) == ids[7:]
+    assert "X-Next-Cursor" not in response.headers
+
+
+def test_patch_rejects_null_for_required_fields(client):
+    item_id = create(client, "Apple", 1.5, quantity=3)
+    for field in ("name", "price", "quantity"):
+        response = client.patch(f"/items/{item_id}", json={field: None})
+        assert response.status_code == 422, response.text
+        assert response.json()["error_type"] == "validation_error"
+    assert_indexes_consistent()
+
+    # The item is untouched and still fully usable
+    assert client.get(f"/items/{item_id}").json()["price"] == 1.5
+    assert ids_of(client.get("/items")) == [item_id]
+    assert ids_of(client.get("/items", params={"min_price": 1})) == [item_id]
+    response = client.patch(f"/items/{item_id}", json={"description": None})
+    assert response.status_code == 200
+    assert client.delete(f"/items/{item_id}").status_code == 200
+    assert_indexes_consistent()
+
+
+def test_skip_is_bounded(client):
+    create(client, "Apple", 1.5)
+    for params in [{}, {"min_price": 1}, {"in_stock": False}]:
+        assert client.get("/items", params={**params, "skip": 2**63 - 1}).json() == []
+        response = client.get("/items", params={**params, "skip": 10**20})
+        assert response.status_code == 422, response.text
+
+
+def test_oversized_integers_are_rejected(client):
+    huge = 10**23
+    response = client.post("/items", json={"name": "Apple", "price": 1.5, "quantity": huge})
+    assert response.status_code == 422, response.text
+    assert response.json()["errors"][0]["input"] == huge
+
+    response = client.post("/items/bulk", json=[{"name": "Apple", "price": 1.5, "quantity": huge}])
+    assert response.status_code == 422, response.text
+
+    item_id = create(client, "Apple", 1.5, quantity=2**63 - 1)
+    assert client.patch(f"/items/{item_id}", json={"quantity": huge}).status_code == 422
+    assert ids_of(client.get("/items")) == [item_id]
+    assert client.get("/items", params={"after_id": huge}).status_code == 422
+
+    for path_id in (huge, -huge):
+        for method in ("get", "delete"):
+            response = getattr(client, method)(f"/items/{path_id}")
+            assert response.status_code == 422, response.text
+        response = client.put(f"/items/{path_id}", json={"name": "Apple", "price": 1.5})
+        assert response.status_code == 422, response.text
+    for path_id in (2**63 - 1, -(2**63), -5):
+        assert client.get(f"/items/{path_id}").status_code == 404
+    assert_indexes_consistent()
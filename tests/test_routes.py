@@ -0,0 +1,79 @@
+import inspect
+import threading
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.routing import APIRoute
+from fastapi.security import OAuth2PasswordBearer
+
+import main
+from main import app
+
+HOT_PATHS = {"/", "/health"}
+
+
+def _hot_routes() -> list[APIRoute]:
+    return [
+        route
+        for route in app.router.routes
+        if isinstance(route, APIRoute)
+        and (route.path in HOT_PATHS or route.path.startswith("/items"))
+    ]
+
+
+def test_hot_routes_are_registered():
+    paths = {route.path for route in _hot_routes()}
+    assert {"/", "/health", "/items", "/items/{item_id}", "/items/bulk"} <= paths
+
+
+@pytest.mark.parametrize("route", _hot_routes(), ids=lambda r: f"{sorted(r.methods)} {r.path}")
+def test_endpoint_is_coroutine(route: APIRoute):
+    # Sync endpoints are offloaded to the threadpool on every request
+    assert inspect.iscoroutinefunction(route.endpoint)
+
+
+@pytest.mark.parametrize("route", _hot_routes(), ids=lambda r: f"{sorted(r.methods)} {r.path}")
+def test_dependencies_are_coroutines(route: APIRoute):
+    assert main._sync_callables(route) == []
+
+
+class AsyncCallableDependency:
+    async def __call__(self) -> int:
+        return 1
+
+
+class SyncCallableDependency:
+    def __call__(self) -> int:
+        return 1
+
+
+def test_sync_callables_handles_callable_instances():
+    probe = FastAPI()
+
+    async def async_generator_dependency():
+        yield 1
+
+    def sync_function_dependency() -> int:
+        return 1
+
+    @probe.get("/probe")
+    async def probe_endpoint(
+        a: int = Depends(AsyncCallableDependency()),
+        b: str | None = Depends(OAuth2PasswordBearer(tokenUrl="token", auto_error=False)),
+        c: int = Depends(async_generator_dependency),
+        d: int = Depends(SyncCallableDependency()),
+        e: int = Depends(sync_function_dependency),
+    ):
+        return {}
+
+    route = next(r for r in probe.routes if isinstance(r, APIRoute))
+    assert sorted(main._sync_callables(route)) == ["SyncCallableDependency", "sync_function_dependency"]
+
+
+def test_run_blocking_uses_its_own_limiter(client):
+    thread_name, result = client.portal.call(
+        main.run_blocking, lambda x: (threading.current_thread().name, x * 2), 21
+    )
+    assert result == 42
+    assert thread_name != threading.main_thread().name
+    assert main._blocking_limiter.total_tokens == main.BLOCKING_IO_TOKENS